@@ -1,25 +1,25 @@
-import os
 import json
 from typing import List
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from supabase import create_client, Client
 from dotenv import load_dotenv
-from models import Lead, LeadCreate, LeadUpdate, Activity
+from models import Lead, LeadCreate, LeadUpdate, Activity, LeadSelection, BulkLeadUpdate, BulkLeadDelete
 from services.grok import GrokService
+from services.storage import get_client
+from services.profiling import ProfilingMiddleware, TracedClient, claim_request
 from pydantic import BaseModel
 
 load_dotenv()
 
-# Initialize Supabase
-url: str = os.environ.get("SUPABASE_URL")
-key: str = os.environ.get("SUPABASE_KEY")
-supabase: Client = create_client(url, key)
+# Initialize storage (Supabase or embedded SQLite, see STORAGE_BACKEND)
+# Wrapped so each query is recorded on the request's profiling trace
+db = TracedClient(get_client())
 
 # Initialize Grok
 grok = GrokService()
 
-app = FastAPI(title="xAI Takehome API")
+# claim_request lets the profiler attribute samples to the request's own task
+app = FastAPI(title="xAI Takehome API", dependencies=[Depends(claim_request)])
 
 app.add_middleware(
     CORSMiddleware,
@@ -36,6 +36,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Span timeline + slow-request logging; full profiles on demand (see services/profiling.py)
+app.add_middleware(ProfilingMiddleware)
+
 @app.get("/")
 def read_root():
     return {"message": "Lead Management API Active"}
@@ -46,29 +49,29 @@ def read_root():
 def get_dashboard_stats():
     try:
         # 1. Metrics
-        total_leads = supabase.table("leads").select("*", count="exact", head=True).execute().count
+        total_leads = db.table("leads").select("*", count="exact", head=True).execute().count
         
-        qualified_leads = supabase.table("leads").select("*", count="exact", head=True).eq("stage", "qualified").execute().count
+        qualified_leads = db.table("leads").select("*", count="exact", head=True).eq("stage", "qualified").execute().count
         
-        emails = supabase.table("activities").select("*", count="exact", head=True).eq("type", "email").execute().count
-        messages = supabase.table("activities").select("*", count="exact", head=True).eq("type", "message").execute().count
+        emails = db.table("activities").select("*", count="exact", head=True).eq("type", "email").execute().count
+        messages = db.table("activities").select("*", count="exact", head=True).eq("type", "message").execute().count
         total_messages = (emails or 0) + (messages or 0)
         
-        meetings = supabase.table("activities").select("*", count="exact", head=True).eq("type", "meeting").execute().count
+        meetings = db.table("activities").select("*", count="exact", head=True).eq("type", "meeting").execute().count
 
         # New metrics
-        notified_leads = supabase.table("leads").select("*", count="exact", head=True).eq("notification_sent", True).execute().count
-        responded_leads = supabase.table("leads").select("*", count="exact", head=True).eq("response_received", True).execute().count
+        notified_leads = db.table("leads").select("*", count="exact", head=True).eq("notification_sent", True).execute().count
+        responded_leads = db.table("leads").select("*", count="exact", head=True).eq("response_received", True).execute().count
 
         # 2. Pipeline Stages
         stages = ["new", "contacted", "qualified", "engaged", "proposal", "closed"]  # Added engaged
         pipeline_stats = []
         for stage in stages:
-            count = supabase.table("leads").select("*", count="exact", head=True).eq("stage", stage).execute().count
+            count = db.table("leads").select("*", count="exact", head=True).eq("stage", stage).execute().count
             pipeline_stats.append({"name": stage, "count": count or 0})
 
         # 3. Recent Activity
-        recent_activities = supabase.table("activities").select("*, leads(company, contact)").order("created_at", desc=True).limit(5).execute().data
+        recent_activities = db.table("activities").select("*, leads(company, contact)").order("created_at", desc=True).limit(5).execute().data
 
         return {
             "metrics": {
@@ -94,7 +97,7 @@ def get_leads():
     try:
         # Using select("*") is okay for small datasets, but for 'lots of data' 
         # we might want to implement pagination later.
-        response = supabase.table("leads").select("*").execute()
+        response = db.table("leads").select("*").execute()
         return response.data
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -102,7 +105,7 @@ def get_leads():
 @app.get("/leads/{lead_id}", response_model=Lead)
 def get_lead(lead_id: str):
     try:
-        response = supabase.table("leads").select("*").eq("id", lead_id).single().execute()
+        response = db.table("leads").select("*").eq("id", lead_id).single().execute()
         return response.data
     except Exception as e:
         raise HTTPException(status_code=404, detail="Lead not found")
@@ -111,11 +114,119 @@ from models import Lead, LeadCreate, Activity, LeadUpdate
 
 # ... imports ...
 
+# Fields Grok uses to score a lead; changing any of them triggers re-qualification
+SCORING_FIELDS = ["company", "industry", "employees"]
+
+# Cap on explicit ids per bulk request: PostgREST sends in.(...) in the URL, and
+# thousands of UUIDs exceed common URL length limits. Use a filter for larger sets.
+MAX_BULK_IDS = 500
+
+# Page size for reads that must see every matching row (PostgREST caps responses at 1000 rows)
+PAGE_SIZE = 1000
+
+def apply_lead_selection(query, selection: LeadSelection):
+    """Narrows a leads query to the ids and/or filter of a bulk request."""
+    if selection.ids is not None:
+        query = query.in_("id", selection.ids)
+    if selection.filter:
+        for column, value in selection.filter.model_dump().items():
+            if value is not None:
+                query = query.eq(column, value)
+    return query
+
+def validate_lead_selection(selection: LeadSelection):
+    # Refuse to touch every lead when neither ids nor a filter were given
+    has_filter = selection.filter and any(v is not None for v in selection.filter.model_dump().values())
+    if selection.ids is None and not has_filter:
+        raise HTTPException(status_code=400, detail="Provide lead ids or a filter")
+    if selection.ids is not None and len(selection.ids) > MAX_BULK_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_IDS} ids per request; use a filter for larger sets")
+
+def select_all_leads(columns: str, selection: LeadSelection) -> List[dict]:
+    """Reads every lead matching a bulk selection, paging past the PostgREST row cap."""
+    rows, start = [], 0
+    while True:
+        page = apply_lead_selection(db.table("leads").select(columns), selection) \
+            .order("id").range(start, start + PAGE_SIZE - 1).execute().data or []
+        rows += page
+        if len(page) < PAGE_SIZE:
+            return rows
+        start += PAGE_SIZE
+
+@app.patch("/leads")
+def bulk_update_leads(bulk_update: BulkLeadUpdate, background_tasks: BackgroundTasks):
+    """
+    Applies one update to many leads in a single statement, logs the matching
+    activities in one batch insert, and re-qualifies only leads whose scoring fields changed.
+    """
+    validate_lead_selection(bulk_update)
+
+    update_data = {k: v for k, v in bulk_update.update.model_dump().items() if v is not None}
+    if not update_data:
+        raise HTTPException(status_code=400, detail="No fields to update")
+    # Field changes to log as a generic update activity (the response transition gets its own)
+    changed_fields = dict(update_data)
+    if update_data.get("response_received"):
+        # Same transition as mark_response_received
+        update_data.setdefault("stage", "engaged")
+        changed_fields.pop("response_received")
+
+    try:
+        # Snapshot scoring fields first so unchanged rows aren't sent back to Grok.
+        # Not atomic with the update: a concurrent edit can at worst cause one extra
+        # or one skipped re-score, and only rows the update touched are re-scored.
+        scoring_update = {k: v for k, v in update_data.items() if k in SCORING_FIELDS}
+        rescore_ids = set()
+        if scoring_update:
+            current = select_all_leads(", ".join(["id"] + list(scoring_update)), bulk_update)
+            rescore_ids = {
+                row["id"] for row in current
+                if any(row.get(k) != v for k, v in scoring_update.items())
+            }
+
+        updated_leads = apply_lead_selection(db.table("leads").update(update_data), bulk_update).execute().data or []
+
+        activities = []
+        if update_data.get("response_received"):
+            activities.append({"type": "response", "action": "Lead responded to notification"})
+        if changed_fields:
+            changes = ", ".join(f"{k}={v}" for k, v in changed_fields.items())
+            activities.append({"type": "update", "action": f"Bulk update: {changes}"})
+        if updated_leads:
+            db.table("activities").insert([
+                {"lead_id": lead["id"], "grok_generated": False, **activity}
+                for lead in updated_leads for activity in activities
+            ]).execute()
+
+        requalified = [lead for lead in updated_leads if lead["id"] in rescore_ids]
+        for lead in requalified:
+            background_tasks.add_task(qualify_lead_background, lead)
+
+        return {
+            "updated": len(updated_leads),
+            "lead_ids": [lead["id"] for lead in updated_leads],
+            "requalified": len(requalified)
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.delete("/leads")
+def bulk_delete_leads(bulk_delete: BulkLeadDelete):
+    """Deletes many leads in a single statement (activities cascade)."""
+    validate_lead_selection(bulk_delete)
+
+    try:
+        response = apply_lead_selection(db.table("leads").delete(), bulk_delete).execute()
+        deleted_ids = [lead["id"] for lead in response.data or []]
+        return {"deleted": len(deleted_ids), "lead_ids": deleted_ids}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.delete("/leads/{lead_id}")
 def delete_lead(lead_id: str):
     try:
         # Supabase delete requires a filter
-        response = supabase.table("leads").delete().eq("id", lead_id).execute()
+        response = db.table("leads").delete().eq("id", lead_id).execute()
         if not response.data:
              # If no data returned, check if it existed or just successful empty
              # Assuming standard Supabase behavior
@@ -130,7 +241,7 @@ def update_lead(lead_id: str, lead_update: LeadUpdate, background_tasks: Backgro
         # Filter out None values to only update provided fields
         update_data = {k: v for k, v in lead_update.model_dump().items() if v is not None}
         
-        response = supabase.table("leads").update(update_data).eq("id", lead_id).execute()
+        response = db.table("leads").update(update_data).eq("id", lead_id).execute()
         
         if not response.data:
             raise HTTPException(status_code=404, detail="Lead not found")
@@ -139,7 +250,7 @@ def update_lead(lead_id: str, lead_update: LeadUpdate, background_tasks: Backgro
 
         # Trigger re-scoring if critical fields changed
         # We check if company, industry, or employees are in the update_data
-        if any(k in update_data for k in ["company", "industry", "employees"]):
+        if any(k in update_data for k in SCORING_FIELDS):
             background_tasks.add_task(qualify_lead_background, updated_lead)
             
         return updated_lead
@@ -156,7 +267,7 @@ async def create_lead(lead: LeadCreate, background_tasks: BackgroundTasks):
         # 1. Insert initial lead
         lead_data = lead.model_dump()
         lead_data["score"] = 0 # Default until Grok runs
-        response = supabase.table("leads").insert(lead_data).execute()
+        response = db.table("leads").insert(lead_data).execute()
         new_lead = response.data[0]
 
         # 2. Schedule Grok qualification in background
@@ -177,10 +288,10 @@ async def qualify_lead_background(lead_data: dict):
             "stage": result.get("stage", "new"),
             "insights": result.get("insights", [])
         }
-        supabase.table("leads").update(update_data).eq("id", lead_data["id"]).execute()
+        db.table("leads").update(update_data).eq("id", lead_data["id"]).execute()
         
         # Log the activity
-        supabase.table("activities").insert({
+        db.table("activities").insert({
             "lead_id": lead_data["id"],
             "type": "analysis",
             "action": f"Grok Qualification: {result.get('reasoning', 'Scored lead')}",
@@ -199,7 +310,7 @@ async def notify_leads(lead_ids: List[str], background_tasks: BackgroundTasks):
         notified = []
         for lead_id in lead_ids:
             # Fetch lead
-            lead_response = supabase.table("leads").select("*").eq("id", lead_id).single().execute()
+            lead_response = db.table("leads").select("*").eq("id", lead_id).single().execute()
             if not lead_response.data or lead_response.data.get("stage") != "qualified":
                 continue  # Skip non-qualified
             
@@ -221,10 +332,10 @@ async def generate_and_log_notification(lead_id: str, lead_data: dict):
         message_result = await grok.generate_notification_message(lead_data)
         
         # Update lead: Mark as notified
-        supabase.table("leads").update({"notification_sent": True}).eq("id", lead_id).execute()
+        db.table("leads").update({"notification_sent": True}).eq("id", lead_id).execute()
         
         # Log activity
-        supabase.table("activities").insert({
+        db.table("activities").insert({
             "lead_id": lead_id,
             "type": "notification",
             "action": f"Sent: {message_result.get('subject', 'Outreach Email')}",
@@ -240,12 +351,12 @@ async def generate_and_log_notification(lead_id: str, lead_data: dict):
 @app.patch("/leads/{lead_id}/respond")
 def mark_response_received(lead_id: str):
     try:
-        response = supabase.table("leads").update({"response_received": True, "stage": "engaged"}).eq("id", lead_id).execute()
+        response = db.table("leads").update({"response_received": True, "stage": "engaged"}).eq("id", lead_id).execute()
         if not response.data:
             raise HTTPException(status_code=404, detail="Lead not found")
         
         # Log activity
-        supabase.table("activities").insert({
+        db.table("activities").insert({
             "lead_id": lead_id,
             "type": "response",
             "action": "Lead responded to notification",
@@ -291,7 +402,7 @@ class MessageGenerate(BaseModel):
 @app.get("/leads/{lead_id}/messages")
 def get_lead_messages(lead_id: str):
     try:
-        response = supabase.table("activities").select("*").eq("lead_id", lead_id).order("created_at", desc=True).execute()
+        response = db.table("activities").select("*").eq("lead_id", lead_id).order("created_at", desc=True).execute()
         return {"messages": response.data or []}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -300,7 +411,7 @@ def get_lead_messages(lead_id: str):
 async def generate_message(request: MessageGenerate):
     try:
         # Fetch lead
-        lead_response = supabase.table("leads").select("*").eq("id", request.lead_id).single().execute()
+        lead_response = db.table("leads").select("*").eq("id", request.lead_id).single().execute()
         if not lead_response.data:
             raise HTTPException(status_code=404, detail="Lead not found")
         
@@ -321,7 +432,7 @@ async def generate_message(request: MessageGenerate):
                 "reasoning": message_result.get('reasoning')
             })
         }
-        supabase.table("activities").insert(activity_data).execute()
+        db.table("activities").insert(activity_data).execute()
         
         return {
             "success": True,
@@ -45,7 +45,26 @@ class LeadUpdate(BaseModel):
     insights: Optional[List[str]] = None
     notification_sent: Optional[bool] = None
     response_received: Optional[bool] = None
-    
+
+# Column filter for bulk operations (all provided fields must match)
+class LeadFilter(BaseModel):
+    stage: Optional[str] = None
+    industry: Optional[str] = None
+    employees: Optional[str] = None
+    notification_sent: Optional[bool] = None
+    response_received: Optional[bool] = None
+
+# Bulk operations target leads by id list and/or filter
+class LeadSelection(BaseModel):
+    ids: Optional[List[str]] = None
+    filter: Optional[LeadFilter] = None
+
+class BulkLeadDelete(LeadSelection):
+    pass
+
+class BulkLeadUpdate(LeadSelection):
+    update: LeadUpdate
+
 # Properties to return to client
 class Lead(LeadBase):
     id: str
@@ -1,146 +1,224 @@
-import os
-import asyncio
+import json
+import time
+import uuid
+import random
+import argparse
 from dotenv import load_dotenv
-from supabase import create_client, Client
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from services.storage import get_client
 
 load_dotenv()
 
-url: str = os.environ.get("SUPABASE_URL")
-key: str = os.environ.get("SUPABASE_KEY")
+# Default distributions (value -> relative weight). Override any of them with --config.
+DEFAULT_CONFIG: Dict[str, Any] = {
+    "stages": {"new": 35, "contacted": 25, "qualified": 15, "engaged": 10, "proposal": 10, "closed": 5},
+    "industries": {
+        "Technology": 25, "Healthcare": 15, "Finance": 15, "Manufacturing": 10,
+        "Retail": 10, "Education": 10, "Real Estate": 5, "Other": 10
+    },
+    "employees": {"1-10": 15, "11-50": 20, "51-200": 25, "201-500": 15, "501-1000": 10, "1000+": 15},
+    "activity_types": {"email": 35, "call": 20, "meeting": 10, "message": 20, "notification": 10, "response": 5},
+    # Eval-case inputs (see expected_qualification for how they are labelled)
+    "budgets": {"Unknown": 15, "$10k": 10, "$50k": 15, "$100k": 15, "$200k": 15, "$500k": 15, "$1M+": 15},
+    "interactions": {
+        "Demo request": 10, "Positive call": 10, "Contract negotiation": 5, "Demo scheduled": 10,
+        "Partnership discussion": 5, "Follow-up call": 10, "Inquiry email": 10, "Newsletter signup": 10,
+        "No response": 10, "No interaction": 5, "Initial email": 10, "Visit": 5
+    },
+    "activities_per_lead": 3,
+    "days_of_history": 90
+}
 
-if not url or not key:
-    print("Error: SUPABASE_URL or SUPABASE_KEY not found in environment.")
-    exit(1)
+# Score range per stage, so generated pipelines look like Grok has already qualified them
+STAGE_SCORES = {
+    "new": (20, 70), "contacted": (40, 80), "qualified": (70, 95),
+    "engaged": (75, 98), "proposal": (80, 99), "closed": (85, 100)
+}
 
-supabase: Client = create_client(url, key)
+COMPANY_PREFIXES = ["Acme", "Nimbus", "Vertex", "Blue Harbor", "Quantum", "Summit", "Ironwood", "Northstar",
+                    "Brightline", "Cobalt", "Evergreen", "Helix", "Lumen", "Pioneer", "Redwood", "Silverline"]
+COMPANY_SUFFIXES = ["Corporation", "Labs", "Systems", "Solutions", "Group", "Inc", "Technologies", "Partners"]
+FIRST_NAMES = ["John", "Sarah", "Michael", "Emily", "Robert", "Lisa", "David", "Priya", "Carlos", "Mei",
+               "Ahmed", "Olivia", "James", "Sofia", "Daniel", "Aisha"]
+LAST_NAMES = ["Smith", "Johnson", "Chen", "Davis", "Wilson", "Anderson", "Garcia", "Patel", "Kim", "Nguyen",
+              "Martinez", "Brown", "Okafor", "Rossi", "Schmidt", "Lopez"]
+JOB_TITLES = ["CEO", "CTO", "VP of Sales", "Head of Operations", "Director of Engineering", "Procurement Manager"]
+LOCATIONS = ["San Francisco, CA", "New York, NY", "Austin, TX", "Seattle, WA", "Boston, MA", "London, UK",
+             "Toronto, Canada", "Berlin, Germany"]
 
-async def seed_data():
-    print("Starting seed process...")
+ACTIVITY_ACTIONS = {
+    "email": "Email sent to {company}",
+    "call": "Call scheduled with {company}",
+    "meeting": "Meeting completed with {company}",
+    "message": "LinkedIn message to {contact}",
+    "notification": "Sent: Outreach to {company}",
+    "response": "Lead responded to notification",
+    "analysis": "Grok Qualification: Scored {company}"
+}
 
-    # 1. Clear existing data (optional, be careful in prod)
-    # Note: Cascade delete on leads will clear activities too
-    # This is a bit aggressive, but fine for dev
-    try:
-        print("Clearing existing leads...")
-        # We have to fetch IDs first to delete them because Supabase-py delete requires a filter
-        # Or use a wide filter.
-        leads = supabase.table("leads").select("id").execute()
-        for lead in leads.data:
-            supabase.table("leads").delete().eq("id", lead["id"]).execute()
-    except Exception as e:
-        print(f"Error clearing data: {e}")
-
-    # 2. Insert Leads
-    leads_data = [
-        {
-            "company": "Acme Corporation",
-            "contact": "John Smith",
-            "email": "john@acme.com",
-            "score": 92,
-            "stage": "qualified",
-            "value": "$45,000",
-            "last_contact": (datetime.now() - timedelta(days=2)).isoformat(),
-            "industry": "Technology"
-        },
-        {
-            "company": "TechStart Inc",
-            "contact": "Sarah Johnson",
-            "email": "sarah@techstart.com",
-            "score": 85,
-            "stage": "contacted",
-            "value": "$32,000",
-            "last_contact": (datetime.now() - timedelta(days=1)).isoformat(),
-            "industry": "Software"
-        },
-        {
-            "company": "Innovate Labs",
-            "contact": "Michael Chen",
-            "email": "michael@innovatelabs.com",
-            "score": 78,
-            "stage": "new",
-            "value": "$58,000",
-            "last_contact": (datetime.now() - timedelta(hours=3)).isoformat(),
-            "industry": "Research"
-        },
-        {
-            "company": "DataCo Solutions",
-            "contact": "Emily Davis",
-            "email": "emily@dataco.com",
-            "score": 95,
-            "stage": "proposal",
-            "value": "$72,000",
-            "last_contact": (datetime.now() - timedelta(days=5)).isoformat(),
-            "industry": "Data Analytics"
-        },
-        {
-            "company": "CloudTech Systems",
-            "contact": "Robert Wilson",
-            "email": "robert@cloudtech.com",
-            "score": 88,
-            "stage": "qualified",
-            "value": "$38,000",
-            "last_contact": (datetime.now() - timedelta(weeks=1)).isoformat(),
-            "industry": "Cloud Services"
-        },
-        {
-            "company": "Enterprise Co",
-            "contact": "Lisa Anderson",
-            "email": "lisa@enterpriseco.com",
-            "score": 71,
-            "stage": "contacted",
-            "value": "$95,000",
-            "last_contact": (datetime.now() - timedelta(days=4)).isoformat(),
-            "industry": "Enterprise Software"
-        }
-    ]
-
-    print(f"Inserting {len(leads_data)} leads...")
-    inserted_leads = []
-    for lead in leads_data:
-        res = supabase.table("leads").insert(lead).execute()
-        inserted_leads.append(res.data[0])
-
-    # 3. Insert Activities
-    activities_data = [
-        {
-            "lead_id": inserted_leads[0]["id"], # Acme
-            "type": "email",
-            "action": "Email sent to Acme Corp",
-            "created_at": (datetime.now() - timedelta(minutes=5)).isoformat()
-        },
-        {
-            "lead_id": inserted_leads[1]["id"], # TechStart
-            "type": "call",
-            "action": "Call scheduled with TechStart",
-            "created_at": (datetime.now() - timedelta(minutes=23)).isoformat()
-        },
-        {
-            "lead_id": inserted_leads[2]["id"], # Innovate
-            "type": "meeting",
-            "action": "Meeting completed with Innovate Inc",
-            "created_at": (datetime.now() - timedelta(hours=1)).isoformat()
-        },
-        {
-            "lead_id": inserted_leads[3]["id"], # DataCo
-            "type": "message",
-            "action": "LinkedIn message to DataCo",
-            "created_at": (datetime.now() - timedelta(hours=2)).isoformat()
-        },
-        {
-            "lead_id": inserted_leads[4]["id"], # CloudTech
-            "type": "email",
-            "action": "Follow-up sent to CloudTech",
-            "created_at": (datetime.now() - timedelta(hours=3)).isoformat()
+# Eval labelling rules, mirroring data/lead_eval_set.json. Interactions not listed here count as weak.
+LOW_BUDGETS = {"Unknown", "$10k", "$50k"}
+STRONG_INTERACTIONS = {"Demo request", "Positive call", "Contract negotiation", "Demo scheduled",
+                       "Partnership discussion", "Follow-up call", "Inquiry email"}
+
+
+def weighted_choice(rng: random.Random, weights: Dict[str, float]) -> str:
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def chunked(items: Iterator[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def generate_leads(rng: random.Random, count: int, config: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Yields `count` leads drawn from the configured distributions."""
+    now = datetime.now(timezone.utc)
+    for i in range(count):
+        stage = weighted_choice(rng, config["stages"])
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        company = f"{rng.choice(COMPANY_PREFIXES)} {rng.choice(COMPANY_SUFFIXES)} {i + 1}"
+        domain = company.lower().replace(" ", "") + ".com"
+        created_at = now - timedelta(minutes=rng.randint(0, config["days_of_history"] * 24 * 60))
+        engaged = stage in ("engaged", "proposal", "closed")
+        yield {
+            "id": str(uuid.uuid4()),
+            "company": company,
+            "contact": f"{first} {last}",
+            "email": f"{first.lower()}@{domain}",
+            "phone": f"+1 (555) {rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+            "score": rng.randint(*STAGE_SCORES.get(stage, (0, 100))),
+            "stage": stage,
+            "value": f"${rng.randint(5, 150) * 1000:,}",
+            "industry": weighted_choice(rng, config["industries"]),
+            "employees": weighted_choice(rng, config["employees"]),
+            "website": f"https://{domain}",
+            "location": rng.choice(LOCATIONS),
+            "job_title": rng.choice(JOB_TITLES),
+            "notification_sent": engaged or (stage == "qualified" and rng.random() < 0.5),
+            "response_received": engaged,
+            "last_contact": (created_at + (now - created_at) * rng.random()).isoformat(),
+            "created_at": created_at.isoformat()
         }
-    ]
 
-    print(f"Inserting {len(activities_data)} activities...")
-    for activity in activities_data:
-        supabase.table("activities").insert(activity).execute()
 
-    print("Seed completed successfully!")
+def generate_activities(rng: random.Random, leads: List[Dict[str, Any]], config: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Yields activities for the given leads, timestamped after each lead was created."""
+    now = datetime.now(timezone.utc)
+    mean = config["activities_per_lead"]
+    for lead in leads:
+        created_at = datetime.fromisoformat(lead["created_at"])
+        for _ in range(rng.randint(0, 2 * mean)):
+            activity_type = weighted_choice(rng, config["activity_types"])
+            action = ACTIVITY_ACTIONS.get(activity_type, f"{activity_type.title()} with {{company}}")
+            yield {
+                "lead_id": lead["id"],
+                "type": activity_type,
+                "action": action.format(**lead),
+                "grok_generated": activity_type in ("notification", "analysis", "message"),
+                "created_at": (created_at + (now - created_at) * rng.random()).isoformat()
+            }
+
+
+def expected_qualification(employees: str, budget: str, interaction: str) -> Tuple[Dict[str, Any], str]:
+    """Labels an eval case with the same criteria used in data/lead_eval_set.json."""
+    small = employees in ("1-10", "11-50")
+    budget_ok = budget not in LOW_BUDGETS
+    if small and not budget_ok:
+        return {"qualification": "disqualified", "score_max": 40}, "Small company with low or unknown budget"
+    if budget_ok and interaction in STRONG_INTERACTIONS:
+        return {"qualification": "qualified", "score_min": 75}, "Budget >= $100k with active engagement"
+    return {"qualification": "needs_review", "score_min": 40, "score_max": 70}, "Mixed signals on size, budget or engagement"
+
+
+def generate_eval_cases(rng: random.Random, count: int, config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    cases = []
+    for i, lead in enumerate(generate_leads(rng, count, config)):
+        budget = weighted_choice(rng, config["budgets"])
+        interaction = weighted_choice(rng, config["interactions"])
+        expected, criteria = expected_qualification(lead["employees"], budget, interaction)
+        cases.append({
+            "id": f"generated_{i + 1}",
+            "input": {
+                "company": lead["company"],
+                "employees": lead["employees"],
+                "industry": lead["industry"],
+                "budget": budget,
+                "last_interaction": interaction
+            },
+            "expected_output": expected,
+            "criteria": criteria
+        })
+    return cases
+
+
+def seed_data(db, num_leads: int, config: Dict[str, Any], chunk_size: int = 500, clear: bool = True, seed: Optional[int] = None):
+    print("Starting seed process...")
+    rng = random.Random(seed)
+    start = time.perf_counter()
+
+    # 1. Clear existing data in one filtered delete (cascade on leads clears activities too)
+    if clear:
+        try:
+            print("Clearing existing leads...")
+            db.table("leads").delete(returning="minimal").neq("id", "00000000-0000-0000-0000-000000000000").execute()
+        except Exception as e:
+            print(f"Error clearing data: {e}")
+
+    # 2. Insert leads and their activities chunk by chunk so memory stays flat at any size.
+    # returning="minimal" stops the database from echoing every inserted/deleted row back.
+    total_leads = total_activities = 0
+    for leads in chunked(generate_leads(rng, num_leads, config), chunk_size):
+        db.table("leads").insert(leads, returning="minimal").execute()
+        total_leads += len(leads)
+        for activities in chunked(generate_activities(rng, leads, config), chunk_size):
+            db.table("activities").insert(activities, returning="minimal").execute()
+            total_activities += len(activities)
+        print(f"Inserted {total_leads}/{num_leads} leads, {total_activities} activities...")
+
+    print(f"Seed completed successfully in {time.perf_counter() - start:.2f}s!")
+
+
+def load_config(path: Optional[str] = None) -> Dict[str, Any]:
+    config = dict(DEFAULT_CONFIG)
+    if path:
+        with open(path, "r") as f:
+            config.update(json.load(f))
+    return config
+
 
 if __name__ == "__main__":
-    asyncio.run(seed_data())
+    parser = argparse.ArgumentParser(description="Generate synthetic leads, activities and eval cases.")
+    parser.add_argument("--leads", type=int, default=0, help="Number of leads to generate (replaces existing data)")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Rows per bulk insert")
+    parser.add_argument("--config", help="JSON file overriding DEFAULT_CONFIG distributions")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible datasets")
+    parser.add_argument("--no-clear", action="store_true", help="Keep existing leads and activities")
+    parser.add_argument("--eval-cases", type=int, default=0, help="Number of labelled eval cases to generate")
+    parser.add_argument("--eval-out", default="data/generated_eval_set.json", help="Where to write eval cases")
+    args = parser.parse_args()
+    if not args.leads and not args.eval_cases:
+        parser.error("nothing to do: pass --leads and/or --eval-cases")
+
+    config = load_config(args.config)
+
+    if args.eval_cases:
+        cases = generate_eval_cases(random.Random(args.seed), args.eval_cases, config)
+        with open(args.eval_out, "w") as f:
+            json.dump(cases, f, indent=4)
+        print(f"Wrote {len(cases)} eval cases to {args.eval_out}")
 
+    if args.leads:
+        try:
+            db = get_client()
+        except Exception as e:
+            print(f"Error: {e}")
+            exit(1)
+        seed_data(db, args.leads, config, chunk_size=args.chunk_size, clear=not args.no_clear, seed=args.seed)
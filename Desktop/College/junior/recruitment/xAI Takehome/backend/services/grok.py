@@ -4,6 +4,7 @@ import time
 from openai import AsyncOpenAI
 from typing import List, Dict, Any
 from datetime import datetime
+from services.profiling import span, record_usage
 
 class GrokService:
     def __init__(self):
@@ -35,14 +36,16 @@ class GrokService:
 
         try:
             start_time = time.time()
-            response = await self.client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": "You are an expert sales SDR assistant. You output only valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1  # Low temperature for consistent JSON
-            )
+            with span("grok.qualify_lead", model=model) as s:
+                response = await self.client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": "You are an expert sales SDR assistant. You output only valid JSON."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.1  # Low temperature for consistent JSON
+                )
+                record_usage(s, response)
             duration = time.time() - start_time
             
             content = response.choices[0].message.content
@@ -156,14 +159,16 @@ class GrokService:
 
         try:
             start_time = time.time()
-            response = await self.client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": "You are a sales expert. Generate concise, effective outreach emails."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3  # Slightly creative for messaging
-            )
+            with span("grok.generate_notification_message", model=model) as s:
+                response = await self.client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": "You are a sales expert. Generate concise, effective outreach emails."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.3  # Slightly creative for messaging
+                )
+                record_usage(s, response)
             duration = time.time() - start_time
             
             content = response.choices[0].message.content
@@ -0,0 +1,287 @@
+import os
+import sys
+import hmac
+import json
+import time
+import uuid
+import random
+import asyncio
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Set
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.base import BaseHTTPMiddleware
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_THIS_FILE = os.path.abspath(__file__)
+
+
+def _is_app_file(filename: str) -> bool:
+    return filename.startswith(APP_ROOT) and filename != _THIS_FILE and "site-packages" not in filename
+
+
+class ProfilingSettings:
+    """Read from the environment when the middleware is built, so values from .env apply."""
+
+    def __init__(self):
+        # Per-request profiles require PROFILE_HEADER to carry PROFILE_TOKEN; unset disables the header
+        self.header = os.environ.get("PROFILE_HEADER", "X-Profile")
+        self.token = os.environ.get("PROFILE_TOKEN", "")
+        self.sample_rate = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+        self.dir = os.environ.get("PROFILE_DIR", "profiles")
+        self.interval_ms = float(os.environ.get("PROFILE_INTERVAL_MS", "5"))
+        # Requests slower than this are logged with their span breakdown (0 disables)
+        self.slow_request_ms = float(os.environ.get("SLOW_REQUEST_MS", "1000"))
+
+
+class Span:
+    def __init__(self, name: str, start: float, attrs: Dict[str, Any]):
+        self.name = name
+        self.start = start
+        self.end: Optional[float] = None
+        self.attrs = attrs
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end or time.perf_counter()) - self.start) * 1000
+
+
+class Trace:
+    """Span timeline for a single request."""
+
+    def __init__(self, name: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.spans: List[Span] = []
+        # Threads and asyncio tasks seen running this request's code (see claim())
+        self.threads: Set[int] = set()
+        self.tasks: Set[asyncio.Task] = set()
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end or time.perf_counter()) - self.start) * 1000
+
+    def claim(self):
+        """Marks the calling thread (and asyncio task, if any) as doing work for this trace."""
+        self.threads.add(threading.get_ident())
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        if task is not None:
+            self.tasks.add(task)
+
+    def breakdown(self) -> str:
+        lines = [f"{self.name} took {self.duration_ms:.1f}ms ({len(self.spans)} spans)"]
+        for s in sorted(self.spans, key=lambda s: s.start):
+            attrs = " ".join(f"{k}={v}" for k, v in s.attrs.items())
+            lines.append(f"  +{(s.start - self.start) * 1000:8.1f}ms {s.duration_ms:8.1f}ms  {s.name} {attrs}")
+        return "\n".join(lines)
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Chrome trace-event format, viewable in chrome://tracing, Perfetto or speedscope."""
+        events = [{
+            "name": self.name, "ph": "X", "pid": 1, "tid": 1,
+            "ts": 0, "dur": self.duration_ms * 1000
+        }]
+        for s in self.spans:
+            events.append({
+                "name": s.name, "ph": "X", "pid": 1, "tid": 1,
+                "ts": (s.start - self.start) * 1_000_000, "dur": s.duration_ms * 1000,
+                "args": s.attrs
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Span]:
+    """
+    Times a block (a Supabase query, a Grok call, ...) on the current request's trace.
+    Outside of a request the span is still yielded but not recorded.
+    """
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.claim()
+    s = Span(name, time.perf_counter(), attrs)
+    try:
+        yield s
+    finally:
+        s.end = time.perf_counter()
+        if trace is not None and trace.end is None:
+            trace.spans.append(s)
+
+
+async def claim_request():
+    """FastAPI dependency that claims the endpoint's task before its first span, so early work is sampled too."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.claim()
+
+
+def record_usage(s: Span, response: Any):
+    """Adds token counts from an OpenAI-compatible completion response to a span."""
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        s.attrs["prompt_tokens"] = usage.prompt_tokens
+        s.attrs["completion_tokens"] = usage.completion_tokens
+
+
+class StackSampler:
+    """
+    Wall-clock sampling profiler for one request. Periodically captures the stacks of the
+    threads that trace has claimed, aggregated as folded stacks (flamegraph.pl / speedscope input).
+    On the event loop thread a sample is only kept while one of the trace's own tasks is
+    running, so concurrent requests don't leak into the profile. Threadpool work (sync
+    endpoints) is sampled from its first span onwards. Time spent awaiting network I/O
+    shows up in the span timeline rather than here.
+    """
+
+    def __init__(self, trace: Trace, loop: asyncio.AbstractEventLoop, interval_ms: float = 5):
+        self.trace = trace
+        self.loop = loop
+        self.loop_thread = threading.get_ident()
+        self.interval = interval_ms / 1000
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own or ident not in self.trace.threads:
+                    continue
+                if ident == self.loop_thread and asyncio.current_task(self.loop) not in self.trace.tasks:
+                    continue
+                stack, in_app = [], False
+                while frame is not None:
+                    code = frame.f_code
+                    in_app = in_app or _is_app_file(code.co_filename)
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if in_app:
+                    stack.append(names.get(ident, str(ident)))
+                    self.stacks[";".join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+
+def write_profile(trace: Trace, sampler: StackSampler, directory: str) -> str:
+    """Writes <id>.folded (call-tree samples) and <id>.trace.json (span timeline) to `directory`."""
+    os.makedirs(directory, exist_ok=True)
+    slug = "_".join(trace.name.replace("/", " ").split())
+    base = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}_{slug}_{trace.id}")
+    with open(f"{base}.folded", "w") as f:
+        f.write(sampler.folded())
+    with open(f"{base}.trace.json", "w") as f:
+        json.dump(trace.to_chrome_trace(), f, default=str)
+    return base
+
+
+class ProfilingMiddleware(BaseHTTPMiddleware):
+    """
+    Records a span timeline for every request, logs requests slower than SLOW_REQUEST_MS
+    with their breakdown, and writes a full profile when the request sends PROFILE_TOKEN
+    in PROFILE_HEADER or is picked by PROFILE_SAMPLE_RATE.
+    """
+
+    def __init__(self, app, settings: Optional[ProfilingSettings] = None):
+        super().__init__(app)
+        self.settings = settings or ProfilingSettings()
+
+    def _wants_profile(self, request) -> bool:
+        if self.settings.sample_rate and random.random() < self.settings.sample_rate:
+            return True
+        supplied = request.headers.get(self.settings.header)
+        if not (self.settings.token and supplied):
+            return False
+        # Compare bytes: compare_digest raises TypeError on non-ASCII str
+        return hmac.compare_digest(supplied.encode(), self.settings.token.encode())
+
+    async def dispatch(self, request, call_next):
+        trace = Trace(f"{request.method} {request.url.path}")
+        token = _current_trace.set(trace)
+        sampler = None
+        if self._wants_profile(request):
+            sampler = StackSampler(trace, asyncio.get_running_loop(), self.settings.interval_ms)
+            sampler.start()
+        try:
+            response = await call_next(request)
+        finally:
+            if sampler:
+                await run_in_threadpool(sampler.stop)
+            trace.end = time.perf_counter()
+            _current_trace.reset(token)
+
+        if sampler:
+            try:
+                path = await run_in_threadpool(write_profile, trace, sampler, self.settings.dir)
+                response.headers["X-Profile-Id"] = trace.id
+                print(f"Profile written: {path}.folded / {path}.trace.json")
+            except Exception as e:
+                print(f"Failed to write profile: {e}")
+
+        slow_ms = self.settings.slow_request_ms
+        if slow_ms and trace.duration_ms >= slow_ms:
+            print(f"Slow request: {trace.breakdown()}")
+
+        return response
+
+
+class TracedQuery:
+    """Wraps a query builder so execute() is recorded as a span with the chained call names."""
+
+    def __init__(self, query: Any, table: str):
+        self._query = query
+        self._table = table
+        self._calls: List[str] = []
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._query, name)
+        if name == "execute":
+            def execute(*args, **kwargs):
+                with span(f"db.{self._table}", query=".".join(self._calls)) as s:
+                    response = attr(*args, **kwargs)
+                    data = getattr(response, "data", None)
+                    s.attrs["rows"] = len(data) if isinstance(data, list) else int(data is not None)
+                    return response
+            return execute
+        if not callable(attr):
+            return attr
+
+        def chain(*args, **kwargs):
+            # Only record column names, never filter values
+            label = f"{name}({args[0]})" if args and isinstance(args[0], str) else name
+            self._calls.append(label)
+            self._query = attr(*args, **kwargs)
+            return self
+        return chain
+
+
+class TracedClient:
+    """Wraps a storage client (Supabase or SQLite) so every query shows up on the request trace."""
+
+    def __init__(self, client: Any):
+        self._client = client
+
+    def table(self, name: str) -> TracedQuery:
+        return TracedQuery(self._client.table(name), name)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
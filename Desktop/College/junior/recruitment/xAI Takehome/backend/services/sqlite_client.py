@@ -0,0 +1,394 @@
+import json
+import sqlite3
+import threading
+import uuid
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leads (
+    id TEXT PRIMARY KEY,
+    company TEXT NOT NULL,
+    contact TEXT NOT NULL,
+    email TEXT NOT NULL,
+    phone TEXT,
+    stage TEXT NOT NULL DEFAULT 'new',
+    value TEXT,
+    score INTEGER NOT NULL DEFAULT 0,
+    industry TEXT,
+    employees TEXT,
+    website TEXT,
+    location TEXT,
+    job_title TEXT,
+    linkedin TEXT,
+    notes TEXT,
+    tags TEXT,
+    insights TEXT DEFAULT '[]',
+    notification_sent INTEGER NOT NULL DEFAULT 0,
+    response_received INTEGER NOT NULL DEFAULT 0,
+    last_contact TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_leads_stage ON leads(stage);
+CREATE INDEX IF NOT EXISTS idx_leads_created_at ON leads(created_at);
+
+CREATE TABLE IF NOT EXISTS activities (
+    id TEXT PRIMARY KEY,
+    lead_id TEXT NOT NULL REFERENCES leads(id) ON DELETE CASCADE,
+    type TEXT NOT NULL,
+    action TEXT NOT NULL,
+    grok_generated INTEGER NOT NULL DEFAULT 0,
+    details TEXT,
+    timestamp TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_activities_lead_id ON activities(lead_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_activities_type ON activities(type);
+CREATE INDEX IF NOT EXISTS idx_activities_created_at ON activities(created_at);
+"""
+
+# Columns stored as JSON text / 0-1 integers that must be converted on the way in and out
+JSON_COLUMNS = {"leads": {"tags", "insights"}}
+BOOL_COLUMNS = {
+    "leads": {"notification_sent", "response_received"},
+    "activities": {"grok_generated"},
+}
+
+# Embeddable relations for select("*, leads(company, contact)"): (table, relation) -> (local key, remote key)
+RELATIONS = {("activities", "leads"): ("lead_id", "id")}
+
+# Stay well below SQLite's bound-parameter limit when expanding IN (...) lists
+MAX_PARAMS = 500
+
+
+class StorageError(Exception):
+    pass
+
+
+class APIResponse:
+    """Mirrors the shape of supabase-py responses (.data / .count)."""
+
+    def __init__(self, data: List[Dict[str, Any]], count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _split_columns(spec: str) -> List[str]:
+    """Splits a select spec on top-level commas, keeping 'leads(company, contact)' intact."""
+    parts, depth, current = [], 0, ""
+    for ch in spec:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0:
+            parts.append(current.strip())
+            current = ""
+        else:
+            current += ch
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+class SQLiteQuery:
+    """
+    Query builder implementing the subset of the supabase-py/PostgREST API used by the
+    backend: select (with counts and embedded relations), insert, update, delete,
+    eq/neq/in_ filters, order, limit/range and single.
+    """
+
+    def __init__(self, client: "SQLiteClient", table: str):
+        if table not in client.columns:
+            raise StorageError(f"Unknown table: {table}")
+        self._client = client
+        self._table = table
+        self._op = "select"
+        self._columns: List[str] = ["*"]
+        self._embeds: List[Tuple[str, List[str]]] = []
+        self._count: Optional[str] = None
+        self._head = False
+        self._payload: Any = None
+        self._returning = "representation"
+        self._filters: List[Tuple[str, str, Any]] = []
+        self._order: List[Tuple[str, bool]] = []
+        self._limit: Optional[int] = None
+        self._offset = 0
+        self._single = False
+
+    # --- Operations ---
+
+    def select(self, *columns: str, count: Optional[str] = None, head: bool = False) -> "SQLiteQuery":
+        self._op = "select"
+        self._columns, self._embeds = [], []
+        for part in _split_columns(",".join(columns) or "*"):
+            if "(" in part:
+                relation, inner = part[:-1].split("(", 1)
+                relation = relation.strip()
+                if (self._table, relation) not in RELATIONS:
+                    raise StorageError(f"No relation '{relation}' on table '{self._table}'")
+                self._embeds.append((relation, self._client.expand(relation, _split_columns(inner))))
+            else:
+                self._columns.append(part)
+        self._columns = self._client.expand(self._table, self._columns)
+        self._count = count
+        self._head = head
+        return self
+
+    def insert(self, json_data: Any, returning: str = "representation") -> "SQLiteQuery":
+        self._op = "insert"
+        self._payload = json_data if isinstance(json_data, list) else [json_data]
+        self._returning = returning
+        return self
+
+    def update(self, json_data: Dict[str, Any]) -> "SQLiteQuery":
+        self._op = "update"
+        self._payload = json_data
+        return self
+
+    def delete(self, returning: str = "representation") -> "SQLiteQuery":
+        self._op = "delete"
+        self._returning = returning
+        return self
+
+    # --- Modifiers ---
+
+    def eq(self, column: str, value: Any) -> "SQLiteQuery":
+        self._filters.append((column, "=", value))
+        return self
+
+    def neq(self, column: str, value: Any) -> "SQLiteQuery":
+        self._filters.append((column, "!=", value))
+        return self
+
+    def in_(self, column: str, values: List[Any]) -> "SQLiteQuery":
+        self._filters.append((column, "IN", list(values)))
+        return self
+
+    def order(self, column: str, desc: bool = False) -> "SQLiteQuery":
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, size: int) -> "SQLiteQuery":
+        self._limit = size
+        return self
+
+    def range(self, start: int, end: int) -> "SQLiteQuery":
+        # Inclusive bounds, like PostgREST
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    def single(self) -> "SQLiteQuery":
+        self._single = True
+        return self
+
+    # --- Execution ---
+
+    def execute(self) -> APIResponse:
+        # returning="minimal" (postgrest ReturnMethod.minimal) skips sending rows back
+        minimal = self._returning == "minimal"
+        if self._op == "insert":
+            return APIResponse(self._client.insert_rows(self._table, self._payload, returning=not minimal))
+
+        where, params = self._where("")
+        if self._op == "update":
+            values = self._client.encode(self._table, self._payload)
+            if not values:
+                raise StorageError("Update requires at least one column")
+            if "updated_at" in self._client.columns[self._table]:
+                values.setdefault("updated_at", _now())
+            assignments = ", ".join(f'"{c}" = ?' for c in values)
+            sql = f'UPDATE "{self._table}" SET {assignments}{where} RETURNING *'
+            return APIResponse(self._client.run(self._table, sql, list(values.values()) + params))
+        if self._op == "delete":
+            sql = f'DELETE FROM "{self._table}"{where}' + ("" if minimal else " RETURNING *")
+            return APIResponse(self._client.run(self._table, sql, params))
+        return self._execute_select()
+
+    def _execute_select(self) -> APIResponse:
+        where, params = self._where("t.")
+        count = None
+        if self._count:
+            count = self._client.scalar(f'SELECT COUNT(*) FROM "{self._table}" AS t{where}', params)
+            if self._head:
+                return APIResponse([], count)
+
+        select_list = [f't."{c}" AS "{c}"' for c in self._columns]
+        joins = []
+        for relation, columns in self._embeds:
+            local, remote = RELATIONS[(self._table, relation)]
+            alias = f"r_{relation}"
+            joins.append(f' LEFT JOIN "{relation}" AS {alias} ON {alias}."{remote}" = t."{local}"')
+            select_list += [f'{alias}."{c}" AS "{relation}.{c}"' for c in columns]
+
+        sql = f'SELECT {", ".join(select_list)} FROM "{self._table}" AS t{"".join(joins)}{where}'
+        if self._order:
+            sql += " ORDER BY " + ", ".join(
+                f't."{self._client.check(self._table, c)}" {"DESC" if desc else "ASC"}' for c, desc in self._order
+            )
+        limit = 2 if self._single else self._limit
+        if limit is not None or self._offset:
+            sql += " LIMIT ? OFFSET ?"
+            params = params + [-1 if limit is None else limit, self._offset]
+
+        rows = self._client.run(self._table, sql, params, embeds=[r for r, _ in self._embeds])
+        if self._single:
+            if len(rows) != 1:
+                raise StorageError(f"Expected a single row from '{self._table}', got {len(rows)}")
+            return APIResponse(rows[0], count)
+        return APIResponse(rows, count)
+
+    def _where(self, prefix: str) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        for column, op, value in self._filters:
+            column = self._client.check(self._table, column)
+            if op == "IN":
+                if not value:
+                    clauses.append("0")
+                    continue
+                clauses.append(f'{prefix}"{column}" IN ({", ".join("?" * len(value))})')
+                params += [self._client.encode_value(self._table, column, v) for v in value]
+            else:
+                clauses.append(f'{prefix}"{column}" {op} ?')
+                params.append(self._client.encode_value(self._table, column, value))
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+class SQLiteClient:
+    """
+    Embedded SQLite storage backend exposing the same table(...) query interface as the
+    Supabase client, so main.py can run against either one.
+    Uses WAL mode with one connection per thread so readers never block the writer.
+    ":memory:" databases use a single connection shared by all threads behind a lock
+    instead: shared-cache mode would lock whole tables and ignore busy_timeout.
+    """
+
+    def __init__(self, path: str = "leads.db"):
+        self.path = path
+        self.in_memory = path == ":memory:"
+        self._local = threading.local()
+        self._lock = threading.RLock() if self.in_memory else nullcontext()
+        self._anchor = self._connect()
+        self._anchor.executescript(SCHEMA)
+        self.columns: Dict[str, List[str]] = {
+            table: [row["name"] for row in self._anchor.execute(f'PRAGMA table_info("{table}")')]
+            for table in ("leads", "activities")
+        }
+
+    def table(self, name: str) -> SQLiteQuery:
+        return SQLiteQuery(self, name)
+
+    # --- Connection handling ---
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, uri=self.path.startswith("file:"), check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self.in_memory:
+            return self._anchor
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    # --- Column handling ---
+
+    def check(self, table: str, column: str) -> str:
+        """Validates a column name before it is interpolated into SQL."""
+        if column not in self.columns[table]:
+            raise StorageError(f"Unknown column '{column}' on table '{table}'")
+        return column
+
+    def expand(self, table: str, columns: List[str]) -> List[str]:
+        expanded = []
+        for column in columns:
+            expanded += self.columns[table] if column == "*" else [self.check(table, column)]
+        return expanded
+
+    def encode_value(self, table: str, column: str, value: Any) -> Any:
+        if value is None:
+            return None
+        if column in JSON_COLUMNS.get(table, ()):
+            return json.dumps(value)
+        if isinstance(value, bool):
+            return int(value)
+        if isinstance(value, datetime):
+            return value.isoformat()
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        return value
+
+    def encode(self, table: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        return {self.check(table, k): self.encode_value(table, k, v) for k, v in row.items()}
+
+    def decode(self, table: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        for column in JSON_COLUMNS.get(table, ()):
+            if row.get(column) is not None:
+                row[column] = json.loads(row[column])
+        for column in BOOL_COLUMNS.get(table, ()):
+            if row.get(column) is not None:
+                row[column] = bool(row[column])
+        return row
+
+    # --- Execution ---
+
+    def scalar(self, sql: str, params: List[Any]) -> Any:
+        with self._lock:
+            return self.conn.execute(sql, params).fetchone()[0]
+
+    def run(self, table: str, sql: str, params: List[Any], embeds: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        with self._lock, self.conn:
+            rows = [dict(row) for row in self.conn.execute(sql, params).fetchall()]
+        results = []
+        for row in rows:
+            for relation in embeds or []:
+                prefix = f"{relation}."
+                nested = {k[len(prefix):]: row.pop(k) for k in list(row) if k.startswith(prefix)}
+                has_match = any(v is not None for v in nested.values())
+                row[relation] = self.decode(relation, nested) if has_match else None
+            results.append(self.decode(table, row))
+        return results
+
+    def insert_rows(self, table: str, rows: List[Dict[str, Any]], returning: bool = True) -> List[Dict[str, Any]]:
+        """Inserts rows in one transaction (executemany per column set) and returns them as stored."""
+        now = _now()
+        groups: Dict[Tuple[str, ...], List[List[Any]]] = {}
+        ids = []
+        for row in rows:
+            row = dict(row)
+            row.setdefault("id", str(uuid.uuid4()))
+            row.setdefault("created_at", now)
+            if "updated_at" in self.columns[table]:
+                row.setdefault("updated_at", now)
+            encoded = self.encode(table, row)
+            ids.append(encoded["id"])
+            groups.setdefault(tuple(encoded), []).append(list(encoded.values()))
+
+        with self._lock, self.conn:
+            for columns, values in groups.items():
+                names = ", ".join(f'"{c}"' for c in columns)
+                placeholders = ", ".join("?" * len(columns))
+                self.conn.executemany(f'INSERT INTO "{table}" ({names}) VALUES ({placeholders})', values)
+        if not returning:
+            return []
+
+        stored = {}
+        for i in range(0, len(ids), MAX_PARAMS):
+            chunk = ids[i:i + MAX_PARAMS]
+            sql = f'SELECT * FROM "{table}" WHERE id IN ({", ".join("?" * len(chunk))})'
+            stored.update((row["id"], row) for row in self.run(table, sql, chunk))
+        return [stored[i] for i in ids]
@@ -0,0 +1,25 @@
+import os
+
+
+def get_client():
+    """
+    Returns the database client for the configured STORAGE_BACKEND.
+    - "supabase" (default): remote Supabase project (SUPABASE_URL / SUPABASE_KEY)
+    - "sqlite": embedded SQLite file at SQLITE_PATH, for single-node deployments and tests
+    Both expose the same table(...) query interface.
+    """
+    backend = os.environ.get("STORAGE_BACKEND", "supabase").lower()
+
+    if backend == "sqlite":
+        from services.sqlite_client import SQLiteClient
+        return SQLiteClient(os.environ.get("SQLITE_PATH", "leads.db"))
+
+    if backend == "supabase":
+        from supabase import create_client
+        url = os.environ.get("SUPABASE_URL")
+        key = os.environ.get("SUPABASE_KEY")
+        if not url or not key:
+            raise RuntimeError("SUPABASE_URL or SUPABASE_KEY not found in environment.")
+        return create_client(url, key)
+
+    raise ValueError(f"Unknown STORAGE_BACKEND '{backend}' (expected 'supabase' or 'sqlite')")
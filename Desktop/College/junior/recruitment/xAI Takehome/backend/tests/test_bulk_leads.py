@@ -0,0 +1,122 @@
+import os
+
+import pytest
+
+os.environ.setdefault("STORAGE_BACKEND", "sqlite")
+os.environ.setdefault("SQLITE_PATH", ":memory:")
+os.environ.setdefault("XAI_API_KEY", "test")
+
+from fastapi.testclient import TestClient
+
+import main
+from services.profiling import TracedClient
+from services.sqlite_client import SQLiteClient
+
+
+@pytest.fixture
+def db(monkeypatch):
+    client = TracedClient(SQLiteClient(":memory:"))
+    monkeypatch.setattr(main, "db", client)
+    return client
+
+
+@pytest.fixture
+def requalified(monkeypatch):
+    calls = []
+
+    async def fake_qualify(lead_data):
+        calls.append(lead_data["id"])
+
+    monkeypatch.setattr(main, "qualify_lead_background", fake_qualify)
+    return calls
+
+
+@pytest.fixture
+def client(db, requalified):
+    return TestClient(main.app)
+
+
+def make_leads(db, *leads):
+    rows = [{"company": "Acme", "contact": "John Smith", "email": "john@acme.com", "value": "$1", **lead} for lead in leads]
+    return [row["id"] for row in db.table("leads").insert(rows).execute().data]
+
+
+def activities_for(db, lead_id):
+    return db.table("activities").select("*").eq("lead_id", lead_id).execute().data
+
+
+def test_requalifies_only_leads_whose_scoring_fields_changed(client, db, requalified):
+    already, changed = make_leads(db, {"industry": "Finance"}, {"industry": "Retail"})
+
+    response = client.patch("/leads", json={"ids": [already, changed], "update": {"industry": "Finance"}})
+
+    assert response.status_code == 200
+    assert response.json()["updated"] == 2
+    assert response.json()["requalified"] == 1
+    assert requalified == [changed]
+
+
+def test_non_scoring_update_does_not_requalify(client, db, requalified):
+    ids = make_leads(db, {}, {})
+    response = client.patch("/leads", json={"ids": ids, "update": {"notes": "follow up"}})
+    assert response.json()["requalified"] == 0
+    assert requalified == []
+
+
+def test_filter_update_pages_past_page_size(client, db, requalified, monkeypatch):
+    monkeypatch.setattr(main, "PAGE_SIZE", 2)
+    ids = make_leads(db, *[{"stage": "contacted", "industry": "Retail"} for _ in range(5)])
+    make_leads(db, {"stage": "new", "industry": "Retail"})
+
+    response = client.patch("/leads", json={"filter": {"stage": "contacted"}, "update": {"industry": "Finance"}})
+
+    assert response.json()["updated"] == 5
+    assert sorted(requalified) == sorted(ids)
+
+
+def test_response_received_moves_to_engaged_and_logs_both_activities(client, db):
+    (lead_id,) = make_leads(db, {"stage": "qualified"})
+
+    response = client.patch("/leads", json={"ids": [lead_id], "update": {"response_received": True, "industry": "Finance"}})
+
+    assert response.status_code == 200
+    lead = db.table("leads").select("*").eq("id", lead_id).single().execute().data
+    assert lead["stage"] == "engaged"
+    assert lead["response_received"] is True
+    actions = sorted((a["type"], a["action"]) for a in activities_for(db, lead_id))
+    assert actions == [("response", "Lead responded to notification"), ("update", "Bulk update: industry=Finance")]
+
+
+def test_response_received_alone_logs_only_response(client, db):
+    (lead_id,) = make_leads(db, {})
+    client.patch("/leads", json={"ids": [lead_id], "update": {"response_received": True}})
+    assert [a["type"] for a in activities_for(db, lead_id)] == ["response"]
+
+
+@pytest.mark.parametrize("method", ["patch", "delete"])
+def test_rejects_missing_selection(client, method):
+    body = {"update": {"stage": "closed"}} if method == "patch" else {}
+    response = client.request(method.upper(), "/leads", json={**body, "filter": {}})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("method", ["patch", "delete"])
+def test_rejects_too_many_ids(client, method):
+    body = {"update": {"stage": "closed"}} if method == "patch" else {}
+    ids = [f"id-{i}" for i in range(main.MAX_BULK_IDS + 1)]
+    response = client.request(method.upper(), "/leads", json={**body, "ids": ids})
+    assert response.status_code == 400
+
+
+def test_empty_ids_touches_nothing(client, db):
+    make_leads(db, {})
+    assert client.patch("/leads", json={"ids": [], "update": {"stage": "closed"}}).json()["updated"] == 0
+    assert client.request("DELETE", "/leads", json={"ids": []}).json()["deleted"] == 0
+    assert db.table("leads").select("*", count="exact", head=True).execute().count == 1
+
+
+def test_bulk_delete_by_filter(client, db):
+    keep, drop = make_leads(db, {"stage": "new"}, {"stage": "closed"})
+    response = client.request("DELETE", "/leads", json={"filter": {"stage": "closed"}})
+    assert response.json() == {"deleted": 1, "lead_ids": [drop]}
+    assert [row["id"] for row in db.table("leads").select("id").execute().data] == [keep]
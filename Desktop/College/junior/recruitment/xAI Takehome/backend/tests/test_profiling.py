@@ -0,0 +1,120 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from services import profiling
+from services.profiling import (
+    ProfilingMiddleware, ProfilingSettings, Span, Trace, TracedClient, claim_request, record_usage
+)
+from services.sqlite_client import SQLiteClient
+
+
+def make_client(tmp_path, **overrides):
+    settings = ProfilingSettings()
+    settings.token = ""
+    settings.sample_rate = 0
+    settings.slow_request_ms = 0
+    settings.dir = str(tmp_path / "profiles")
+    for key, value in overrides.items():
+        setattr(settings, key, value)
+
+    app = FastAPI(dependencies=[Depends(claim_request)])
+    app.add_middleware(ProfilingMiddleware, settings=settings)
+
+    @app.get("/fast")
+    def fast():
+        return {"ok": True}
+
+    @app.get("/slow")
+    def slow():
+        time.sleep(0.05)
+        return {"ok": True}
+
+    return TestClient(app), tmp_path / "profiles"
+
+
+def test_header_ignored_without_token(tmp_path):
+    client, profiles = make_client(tmp_path)
+    response = client.get("/fast", headers={"X-Profile": "1"})
+    assert "X-Profile-Id" not in response.headers
+    assert not profiles.exists()
+
+
+@pytest.mark.parametrize("value", ["wrong", "café".encode()])
+def test_wrong_token_rejected(tmp_path, value):
+    client, profiles = make_client(tmp_path, token="s3cret")
+    response = client.get("/fast", headers={"X-Profile": value})
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
+    assert not profiles.exists()
+
+
+def test_matching_token_writes_profile(tmp_path):
+    client, profiles = make_client(tmp_path, token="s3cret")
+    response = client.get("/fast", headers={"X-Profile": "s3cret"})
+
+    profile_id = response.headers["X-Profile-Id"]
+    written = sorted(p.name for p in profiles.iterdir())
+    assert len(written) == 2
+    assert written[0].endswith(f"_GET_fast_{profile_id}.folded")
+    assert written[1].endswith(f"_GET_fast_{profile_id}.trace.json")
+
+
+def test_slow_request_logged_with_breakdown(tmp_path, capsys):
+    client, _ = make_client(tmp_path, slow_request_ms=20)
+    client.get("/fast")
+    assert "Slow request" not in capsys.readouterr().out
+
+    client.get("/slow")
+    out = capsys.readouterr().out
+    assert "Slow request: GET /slow took" in out
+
+
+def test_slow_logging_disabled_at_zero(tmp_path, capsys):
+    client, _ = make_client(tmp_path, slow_request_ms=0)
+    client.get("/slow")
+    assert "Slow request" not in capsys.readouterr().out
+
+
+def test_traced_query_span_labels_and_rows():
+    db = TracedClient(SQLiteClient(":memory:"))
+    db.table("leads").insert([
+        {"company": c, "contact": "x", "email": "e", "value": "$1", "stage": "qualified"} for c in ("A", "B")
+    ]).execute()
+
+    trace = Trace("GET /test")
+    token = profiling._current_trace.set(trace)
+    try:
+        db.table("leads").select("*").eq("stage", "qualified").order("created_at", desc=True).execute()
+        db.table("leads").select("*", count="exact", head=True).execute()
+        db.table("leads").select("*").eq("id", "missing").execute()
+    finally:
+        profiling._current_trace.reset(token)
+
+    assert [(s.name, s.attrs["query"], s.attrs["rows"]) for s in trace.spans] == [
+        ("db.leads", "select(*).eq(stage).order(created_at)", 2),
+        ("db.leads", "select(*)", 0),
+        ("db.leads", "select(*).eq(id)", 0),
+    ]
+
+
+def test_spans_outside_a_request_are_not_recorded():
+    db = TracedClient(SQLiteClient(":memory:"))
+    trace = Trace("GET /test")
+    db.table("leads").select("*").execute()
+    assert trace.spans == []
+
+
+def test_record_usage_sets_token_counts():
+    s = Span("grok.qualify_lead", time.perf_counter(), {"model": "grok-3"})
+    record_usage(s, SimpleNamespace(usage=SimpleNamespace(prompt_tokens=120, completion_tokens=45)))
+    assert s.attrs == {"model": "grok-3", "prompt_tokens": 120, "completion_tokens": 45}
+
+
+def test_record_usage_without_usage_is_noop():
+    s = Span("grok.qualify_lead", time.perf_counter(), {})
+    record_usage(s, SimpleNamespace())
+    assert s.attrs == {}
@@ -0,0 +1,160 @@
+import threading
+
+import pytest
+
+from services.sqlite_client import SQLiteClient, StorageError
+
+
+@pytest.fixture
+def db():
+    return SQLiteClient(":memory:")
+
+
+def make_lead(db, **fields):
+    lead = {"company": "Acme", "contact": "John Smith", "email": "john@acme.com", "value": "$1,000", **fields}
+    return db.table("leads").insert(lead).execute().data[0]
+
+
+def test_insert_returns_stored_row_with_defaults(db):
+    lead = make_lead(db, tags=["vip"])
+    assert lead["id"] and lead["created_at"] and lead["updated_at"]
+    assert lead["stage"] == "new"
+    assert lead["score"] == 0
+    assert lead["tags"] == ["vip"]
+    assert lead["insights"] == []
+    assert lead["notification_sent"] is False
+
+
+def test_head_count_with_bool_filter(db):
+    make_lead(db, notification_sent=True)
+    make_lead(db, notification_sent=True, stage="qualified")
+    make_lead(db)
+
+    response = db.table("leads").select("*", count="exact", head=True).eq("notification_sent", True).execute()
+    assert response.count == 2
+    assert response.data == []
+
+    qualified = db.table("leads").select("*", count="exact", head=True).eq("stage", "qualified").execute()
+    assert qualified.count == 1
+
+
+def test_order_limit_with_leads_embed(db):
+    acme = make_lead(db, company="Acme", contact="John Smith")
+    dataco = make_lead(db, company="DataCo", contact="Emily Davis")
+    db.table("activities").insert([
+        {"lead_id": acme["id"], "type": "email", "action": "oldest", "created_at": "2026-01-01T00:00:00+00:00"},
+        {"lead_id": dataco["id"], "type": "call", "action": "newest", "created_at": "2026-01-03T00:00:00+00:00"},
+        {"lead_id": acme["id"], "type": "meeting", "action": "middle", "created_at": "2026-01-02T00:00:00+00:00"},
+    ]).execute()
+
+    rows = db.table("activities").select("*, leads(company, contact)").order("created_at", desc=True).limit(2).execute().data
+
+    assert [r["action"] for r in rows] == ["newest", "middle"]
+    assert rows[0]["leads"] == {"company": "DataCo", "contact": "Emily Davis"}
+    assert rows[1]["leads"] == {"company": "Acme", "contact": "John Smith"}
+    assert rows[0]["grok_generated"] is False
+
+
+@pytest.mark.parametrize("rows", [0, 2])
+def test_single_requires_exactly_one_row(db, rows):
+    for _ in range(rows):
+        make_lead(db, stage="qualified")
+    with pytest.raises(StorageError):
+        db.table("leads").select("*").eq("stage", "qualified").single().execute()
+
+
+def test_single_returns_row_dict(db):
+    lead = make_lead(db)
+    row = db.table("leads").select("*").eq("id", lead["id"]).single().execute().data
+    assert row["id"] == lead["id"]
+
+
+def test_update_returning(db):
+    lead = make_lead(db)
+    make_lead(db, company="Other")
+
+    updated = db.table("leads").update({"stage": "engaged", "response_received": True}).eq("id", lead["id"]).execute().data
+
+    assert len(updated) == 1
+    assert updated[0]["stage"] == "engaged"
+    assert updated[0]["response_received"] is True
+    assert updated[0]["updated_at"] >= lead["updated_at"]
+
+
+def test_in_filter_and_empty_in(db):
+    ids = [make_lead(db)["id"] for _ in range(3)]
+    assert len(db.table("leads").select("id").in_("id", ids[:2]).execute().data) == 2
+    assert db.table("leads").update({"stage": "closed"}).in_("id", []).execute().data == []
+
+
+def test_delete_returning_cascades_activities(db):
+    lead = make_lead(db)
+    other = make_lead(db)
+    db.table("activities").insert([
+        {"lead_id": lead["id"], "type": "email", "action": "a"},
+        {"lead_id": other["id"], "type": "email", "action": "b"},
+    ]).execute()
+
+    deleted = db.table("leads").delete().eq("id", lead["id"]).execute().data
+
+    assert [row["id"] for row in deleted] == [lead["id"]]
+    remaining = db.table("activities").select("*").execute().data
+    assert [row["lead_id"] for row in remaining] == [other["id"]]
+
+
+def test_unknown_column_is_rejected(db):
+    with pytest.raises(StorageError):
+        db.table("leads").select("*").eq("stage; DROP TABLE leads", "x").execute()
+
+
+def test_range_pages_are_inclusive_and_exhaust(db):
+    ids = sorted(make_lead(db)["id"] for _ in range(5))
+    pages = [
+        [row["id"] for row in db.table("leads").select("id").order("id").range(start, start + 1).execute().data]
+        for start in (0, 2, 4, 6)
+    ]
+    assert pages == [ids[0:2], ids[2:4], ids[4:5], []]
+
+
+@pytest.mark.parametrize("path", [":memory:", "file"])
+def test_concurrent_readers_and_writers(tmp_path, path):
+    db = SQLiteClient(str(tmp_path / "leads.db") if path == "file" else path)
+    lead = make_lead(db)
+    errors = []
+
+    def writer():
+        try:
+            for i in range(50):
+                make_lead(db, company=f"Co {i}")
+                db.table("activities").insert({"lead_id": lead["id"], "type": "email", "action": "hi"}).execute()
+        except Exception as e:
+            errors.append(e)
+
+    def reader():
+        try:
+            for _ in range(50):
+                db.table("leads").select("*", count="exact", head=True).execute()
+                db.table("activities").select("*, leads(company, contact)").order("created_at", desc=True).limit(5).execute()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer) for _ in range(2)] + [threading.Thread(target=reader) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert db.table("leads").select("*", count="exact", head=True).execute().count == 101
+
+
+def test_returning_minimal_skips_rows(db):
+    inserted = db.table("leads").insert(
+        [{"company": "Acme", "contact": "John Smith", "email": "john@acme.com", "value": "$1"}] * 3,
+        returning="minimal",
+    ).execute()
+    assert inserted.data == []
+
+    deleted = db.table("leads").delete(returning="minimal").neq("id", "").execute()
+    assert deleted.data == []
+    assert db.table("leads").select("*", count="exact", head=True).execute().count == 0